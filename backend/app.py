@@ -3,7 +3,9 @@ from flask_cors import CORS
 import os
 from dotenv import load_dotenv
 from models.cyberbully_detector import CyberbullyDetector
+from models.shadow_evaluator import ShadowEvaluator
 import logging
+import time
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +20,9 @@ CORS(app)
 # Initialize the cyberbullying detector
 detector = None
 
+# Optional candidate model scored in the background on sampled traffic
+shadow_evaluator = None
+
 def initialize_model():
     """Initialize the cyberbullying detection model"""
     global detector
@@ -28,17 +33,39 @@ def initialize_model():
         logger.error(f"Failed to initialize model: {e}")
         raise
 
+def initialize_shadow_model():
+    """Initialize the shadow model if SHADOW_MODEL_PATH is set"""
+    global shadow_evaluator
+    model_path = os.environ.get('SHADOW_MODEL_PATH')
+    if not model_path:
+        return
+
+    # A broken shadow model must never take down the serving model
+    try:
+        shadow_evaluator = ShadowEvaluator(
+            model_path,
+            store_path=os.environ.get('SHADOW_STORE_PATH', 'models/shadow_eval.db'),
+            sample_rate=float(os.environ.get('SHADOW_SAMPLE_RATE', 0.1)),
+            max_pending=int(os.environ.get('SHADOW_MAX_PENDING', 100)),
+            workers=int(os.environ.get('SHADOW_WORKERS', 1)),
+            max_records=int(os.environ.get('SHADOW_MAX_RECORDS', 10000))
+        )
+    except Exception as e:
+        logger.error(f"Failed to initialize shadow model: {e}")
+
 @app.before_first_request
 def setup():
     """Initialize the model before the first request"""
     initialize_model()
+    initialize_shadow_model()
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'model_loaded': detector is not None
+        'model_loaded': detector is not None,
+        'shadow_model_loaded': shadow_evaluator is not None
     })
 
 @app.route('/api/classify-text', methods=['POST'])
@@ -60,10 +87,19 @@ def classify_text():
             }), 400
         
         # Perform classification
+        start = time.perf_counter()
         result = detector.classify(text)
+        latency_ms = (time.perf_counter() - start) * 1000
         
         logger.info(f"Classification completed for text: {text[:50]}...")
         
+        # Hand off to the shadow model without waiting on it
+        if shadow_evaluator is not None:
+            try:
+                shadow_evaluator.maybe_submit(text, result, latency_ms)
+            except Exception as e:
+                logger.error(f"Failed to submit shadow evaluation: {e}")
+        
         return jsonify(result)
         
     except Exception as e:
@@ -102,6 +138,22 @@ def submit_feedback():
             'error': 'Internal server error processing feedback'
         }), 500
 
+@app.route('/api/shadow/stats', methods=['GET'])
+def shadow_stats():
+    """Agreement and latency statistics for the shadow model"""
+    if shadow_evaluator is None:
+        return jsonify({
+            'error': 'Shadow model is not enabled'
+        }), 404
+    
+    try:
+        return jsonify(shadow_evaluator.get_stats())
+    except Exception as e:
+        logger.error(f"Error reading shadow stats: {e}")
+        return jsonify({
+            'error': 'Internal server error reading shadow stats'
+        }), 500
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({
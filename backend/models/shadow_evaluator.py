@@ -0,0 +1,348 @@
+import random
+import sqlite3
+import threading
+import time
+import json
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from .cyberbully_detector import CyberbullyDetector
+
+logger = logging.getLogger(__name__)
+
+class ShadowEvaluator:
+    """
+    Scores a sample of live requests with a candidate model in the background
+    and records how it compares to the serving model
+    """
+
+    def __init__(self, model_path: str, store_path: str = 'models/shadow_eval.db',
+                 sample_rate: float = 0.1, max_pending: int = 100, workers: int = 1,
+                 max_records: int = 10000, store_timeout: float = 5.0):
+        """
+        Initialize the shadow evaluator
+
+        Args:
+            model_path: Path to the candidate model file
+            store_path: Path to the SQLite file holding evaluation records
+            sample_rate: Fraction of requests (0.0 - 1.0) sent to the shadow model
+            max_pending: Maximum number of queued or running shadow jobs
+            workers: Number of background threads scoring shadow requests
+            max_records: Maximum number of evaluation records kept in the store
+            store_timeout: Seconds to wait for the store lock held by other processes
+        """
+        # CyberbullyDetector trains and saves over the default model when the
+        # path is missing, which must never happen for a shadow model
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Shadow model not found: {model_path}")
+
+        self.detector = CyberbullyDetector(model_path)
+        self.model_path = model_path
+        self.store_path = store_path
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.max_records = max_records
+        self.store_timeout = store_timeout
+
+        # Each gunicorn worker has its own evaluator; counters are stored per process
+        self.pid = os.getpid()
+        self.started_at = time.time()
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='shadow-eval'
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._store_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._dropped = 0
+        self._evaluated = 0
+        self._failed = 0
+        self._store_errors = 0
+
+        self._init_store()
+        self._flush_counters()
+        logger.info(
+            f"Shadow model loaded from {model_path} "
+            f"(sample_rate={self.sample_rate}, max_pending={max_pending})"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the store, waiting on locks held by other processes
+        """
+        return sqlite3.connect(self.store_path, timeout=self.store_timeout)
+
+    def _init_store(self):
+        """
+        Create the evaluation tables if they do not exist
+        """
+        directory = os.path.dirname(self.store_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._store_lock, self._connect() as conn:
+            # WAL lets readers and the single writer from each process overlap
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS shadow_results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    model_path TEXT NOT NULL,
+                    agreed INTEGER NOT NULL,
+                    primary_latency_ms REAL NOT NULL,
+                    shadow_latency_ms REAL NOT NULL,
+                    latency_delta_ms REAL NOT NULL,
+                    text TEXT,
+                    primary_result TEXT,
+                    shadow_result TEXT
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS shadow_counters (
+                    pid INTEGER NOT NULL,
+                    started_at REAL NOT NULL,
+                    model_path TEXT NOT NULL,
+                    submitted INTEGER NOT NULL,
+                    dropped INTEGER NOT NULL,
+                    evaluated INTEGER NOT NULL,
+                    failed INTEGER NOT NULL,
+                    store_errors INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (pid, started_at)
+                )
+                """
+            )
+
+    def maybe_submit(self, text: str, primary_result: Dict[str, Any],
+                     primary_latency_ms: float) -> bool:
+        """
+        Queue a request for shadow scoring if it is sampled and there is room
+
+        Never blocks: when the queue is full the request is dropped.
+
+        Args:
+            text: Text that was classified by the serving model
+            primary_result: Result returned by the serving model
+            primary_latency_ms: Serving model latency in milliseconds
+
+        Returns:
+            True if the request was queued
+        """
+        if random.random() >= self.sample_rate:
+            return False
+
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._dropped += 1
+            return False
+
+        # Counted before submitting so a worker never flushes evaluated > submitted
+        with self._stats_lock:
+            self._submitted += 1
+
+        try:
+            future = self._executor.submit(
+                self._evaluate, text, primary_result, primary_latency_ms
+            )
+        except RuntimeError:
+            # Executor already shut down
+            with self._stats_lock:
+                self._submitted -= 1
+            self._slots.release()
+            return False
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return True
+
+    def _evaluate(self, text: str, primary_result: Dict[str, Any],
+                  primary_latency_ms: float):
+        """
+        Score text with the shadow model and record the comparison
+
+        Args:
+            text: Input text
+            primary_result: Result returned by the serving model
+            primary_latency_ms: Serving model latency in milliseconds
+        """
+        try:
+            start = time.perf_counter()
+            shadow_result = self.detector.classify(text)
+            shadow_latency_ms = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            with self._stats_lock:
+                self._failed += 1
+            logger.error(f"Shadow model failed to classify: {e}")
+            self._flush_counters()
+            return
+
+        agreed = shadow_result['classification'] == primary_result['classification']
+
+        try:
+            self._record(
+                agreed=agreed,
+                primary_latency_ms=primary_latency_ms,
+                shadow_latency_ms=shadow_latency_ms,
+                # Only disagreements keep the text and full results
+                text=None if agreed else text,
+                primary_result=None if agreed else primary_result,
+                shadow_result=None if agreed else shadow_result
+            )
+        except sqlite3.Error as e:
+            with self._stats_lock:
+                self._store_errors += 1
+            logger.error(f"Failed to write shadow evaluation to store: {e}")
+        else:
+            with self._stats_lock:
+                self._evaluated += 1
+
+        self._flush_counters()
+
+    def _record(self, agreed: bool, primary_latency_ms: float, shadow_latency_ms: float,
+                text: Optional[str], primary_result: Optional[Dict[str, Any]],
+                shadow_result: Optional[Dict[str, Any]]):
+        """
+        Write one evaluation record to the local store and prune the oldest
+        records past max_records
+        """
+        with self._store_lock, self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO shadow_results (
+                    created_at, model_path, agreed, primary_latency_ms,
+                    shadow_latency_ms, latency_delta_ms, text,
+                    primary_result, shadow_result
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    time.time(),
+                    self.model_path,
+                    int(agreed),
+                    primary_latency_ms,
+                    shadow_latency_ms,
+                    shadow_latency_ms - primary_latency_ms,
+                    text,
+                    json.dumps(primary_result) if primary_result else None,
+                    json.dumps(shadow_result) if shadow_result else None
+                )
+            )
+            conn.execute(
+                """
+                DELETE FROM shadow_results
+                WHERE id <= (SELECT MAX(id) FROM shadow_results) - ?
+                """,
+                (self.max_records,)
+            )
+
+    def _flush_counters(self):
+        """
+        Write this process's counters to the store
+
+        Drops are only counted in memory on the request path and reach the
+        store on the next flush from a worker thread or get_stats().
+        """
+        with self._stats_lock:
+            counters = (
+                self._submitted, self._dropped, self._evaluated,
+                self._failed, self._store_errors
+            )
+
+        try:
+            with self._store_lock, self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO shadow_counters (
+                        pid, started_at, model_path, submitted, dropped,
+                        evaluated, failed, store_errors, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (self.pid, self.started_at, self.model_path) + counters + (time.time(),)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write shadow counters to store: {e}")
+
+    def get_stats(self, disagreement_limit: int = 10) -> Dict[str, Any]:
+        """
+        Summarize shadow evaluation results for the current model
+
+        Counters are summed over every process and restart that evaluated
+        this model. Agreement and latency figures cover the records still
+        retained in the store.
+
+        Args:
+            disagreement_limit: Number of recent disagreement samples to include
+
+        Returns:
+            Dictionary with agreement rate, latency deltas, counters and
+            disagreement samples
+        """
+        self._flush_counters()
+
+        with self._store_lock, self._connect() as conn:
+            stored, agreed, avg_primary, avg_shadow, avg_delta = conn.execute(
+                """
+                SELECT COUNT(*), SUM(agreed), AVG(primary_latency_ms),
+                       AVG(shadow_latency_ms), AVG(latency_delta_ms)
+                FROM shadow_results WHERE model_path = ?
+                """,
+                (self.model_path,)
+            ).fetchone()
+
+            processes, submitted, dropped, evaluated, failed, store_errors = conn.execute(
+                """
+                SELECT COUNT(*), SUM(submitted), SUM(dropped), SUM(evaluated),
+                       SUM(failed), SUM(store_errors)
+                FROM shadow_counters WHERE model_path = ?
+                """,
+                (self.model_path,)
+            ).fetchone()
+
+            rows = conn.execute(
+                """
+                SELECT created_at, text, primary_result, shadow_result
+                FROM shadow_results
+                WHERE model_path = ? AND agreed = 0
+                ORDER BY id DESC LIMIT ?
+                """,
+                (self.model_path, disagreement_limit)
+            ).fetchall()
+
+        return {
+            'model_path': self.model_path,
+            'sample_rate': self.sample_rate,
+            'stored_records': stored,
+            'agreement_rate': agreed / stored if stored else None,
+            'avg_primary_latency_ms': avg_primary,
+            'avg_shadow_latency_ms': avg_shadow,
+            'avg_latency_delta_ms': avg_delta,
+            'processes': processes,
+            'submitted': submitted or 0,
+            'dropped': dropped or 0,
+            'evaluated': evaluated or 0,
+            'failed': failed or 0,
+            'store_errors': store_errors or 0,
+            'disagreements': [
+                {
+                    'created_at': created_at,
+                    'text': text,
+                    'primary': json.loads(primary_result),
+                    'shadow': json.loads(shadow_result)
+                }
+                for created_at, text, primary_result, shadow_result in rows
+            ]
+        }
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stop the background workers
+
+        Args:
+            wait: Whether to wait for queued evaluations to finish
+        """
+        self._executor.shutdown(wait=wait)
+        self._flush_counters()
@@ -0,0 +1,181 @@
+import importlib
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+
+class StubDetector:
+    """
+    Stand-in for CyberbullyDetector that flags any text containing 'ugly'
+    and can be held on a gate to keep jobs pending
+    """
+
+    gate = None
+    fail = False
+
+    def __init__(self, model_path: str = None):
+        self.model_path = model_path
+
+    def classify(self, text: str):
+        if StubDetector.gate is not None:
+            StubDetector.gate.wait(5)
+        if StubDetector.fail:
+            raise ValueError('shadow model exploded')
+        return {
+            'classification': 'Cyberbullying' if 'ugly' in text else 'Safe',
+            'confidence': 0.9,
+            'theme': 'general_bullying' if 'ugly' in text else 'safe',
+            'keywords': ['ugly'] if 'ugly' in text else []
+        }
+
+
+@pytest.fixture
+def shadow_module(monkeypatch):
+    """Import shadow_evaluator against the stub detector"""
+    stub = types.ModuleType('models.cyberbully_detector')
+    stub.CyberbullyDetector = StubDetector
+    monkeypatch.setitem(sys.modules, 'models.cyberbully_detector', stub)
+    monkeypatch.delitem(sys.modules, 'models.shadow_evaluator', raising=False)
+    monkeypatch.setattr(StubDetector, 'gate', None)
+    monkeypatch.setattr(StubDetector, 'fail', False)
+    return importlib.import_module('models.shadow_evaluator')
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = tmp_path / 'candidate_model.pkl'
+    path.write_bytes(b'')
+    return str(path)
+
+
+def make_evaluator(shadow_module, model_file, tmp_path, **kwargs):
+    kwargs.setdefault('sample_rate', 1.0)
+    return shadow_module.ShadowEvaluator(
+        model_file, store_path=str(tmp_path / 'store' / 'shadow.db'), **kwargs
+    )
+
+
+def primary(classification):
+    return {'classification': classification, 'confidence': 0.8, 'theme': 'safe', 'keywords': []}
+
+
+def test_missing_model_file_is_rejected(shadow_module, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        make_evaluator(shadow_module, str(tmp_path / 'missing.pkl'), tmp_path)
+
+
+def test_drops_when_queue_is_full(shadow_module, model_file, tmp_path):
+    StubDetector.gate = threading.Event()
+    evaluator = make_evaluator(shadow_module, model_file, tmp_path, max_pending=3)
+
+    start = time.perf_counter()
+    queued = [evaluator.maybe_submit('hello', primary('Safe'), 1.0) for _ in range(20)]
+    elapsed = time.perf_counter() - start
+
+    assert queued.count(True) == 3
+    assert queued.count(False) == 17
+    # Submitting must not wait on the blocked shadow model
+    assert elapsed < 1.0
+
+    StubDetector.gate.set()
+    evaluator.shutdown(wait=True)
+
+    # Every slot is released once the jobs finish
+    for _ in range(3):
+        assert evaluator._slots.acquire(blocking=False)
+
+    stats = evaluator.get_stats()
+    assert stats['submitted'] == 3
+    assert stats['dropped'] == 17
+    assert stats['evaluated'] == 3
+    assert stats['failed'] == 0
+    assert stats['store_errors'] == 0
+
+
+def test_sample_rate_zero_submits_nothing(shadow_module, model_file, tmp_path):
+    evaluator = make_evaluator(shadow_module, model_file, tmp_path, sample_rate=0.0)
+
+    assert not any(evaluator.maybe_submit('hello', primary('Safe'), 1.0) for _ in range(50))
+
+    evaluator.shutdown(wait=True)
+    stats = evaluator.get_stats()
+    assert stats['submitted'] == 0
+    assert stats['dropped'] == 0
+
+
+def test_agreement_rate_and_disagreements(shadow_module, model_file, tmp_path):
+    evaluator = make_evaluator(shadow_module, model_file, tmp_path)
+
+    evaluator.maybe_submit('have a nice day', primary('Safe'), 2.0)
+    evaluator.maybe_submit('you are ugly', primary('Cyberbullying'), 2.0)
+    evaluator.maybe_submit('thanks for the help', primary('Safe'), 2.0)
+    evaluator.maybe_submit('ugly weather today', primary('Safe'), 2.0)
+    evaluator.shutdown(wait=True)
+
+    stats = evaluator.get_stats()
+    assert stats['stored_records'] == 4
+    assert stats['agreement_rate'] == pytest.approx(0.75)
+    assert stats['avg_primary_latency_ms'] == pytest.approx(2.0)
+
+    assert len(stats['disagreements']) == 1
+    disagreement = stats['disagreements'][0]
+    assert disagreement['text'] == 'ugly weather today'
+    assert disagreement['primary']['classification'] == 'Safe'
+    assert disagreement['shadow']['classification'] == 'Cyberbullying'
+
+
+def test_oldest_records_are_pruned(shadow_module, model_file, tmp_path):
+    evaluator = make_evaluator(shadow_module, model_file, tmp_path, max_records=5)
+
+    for i in range(12):
+        evaluator.maybe_submit(f'ugly {i}', primary('Safe'), 1.0)
+    evaluator.shutdown(wait=True)
+
+    stats = evaluator.get_stats(disagreement_limit=100)
+    assert stats['stored_records'] == 5
+    assert stats['evaluated'] == 12
+    assert [d['text'] for d in stats['disagreements']] == [f'ugly {i}' for i in range(11, 6, -1)]
+
+
+def test_shadow_model_errors_count_as_failed(shadow_module, model_file, tmp_path):
+    StubDetector.fail = True
+    evaluator = make_evaluator(shadow_module, model_file, tmp_path)
+
+    evaluator.maybe_submit('hello', primary('Safe'), 1.0)
+    evaluator.shutdown(wait=True)
+
+    stats = evaluator.get_stats()
+    assert stats['failed'] == 1
+    assert stats['store_errors'] == 0
+    assert stats['stored_records'] == 0
+
+
+def test_counters_are_summed_across_processes(shadow_module, model_file, tmp_path, monkeypatch):
+    first = make_evaluator(shadow_module, model_file, tmp_path)
+    # Simulate a second gunicorn worker
+    monkeypatch.setattr(shadow_module.os, 'getpid', lambda: first.pid + 1)
+    second = make_evaluator(shadow_module, model_file, tmp_path)
+
+    first.maybe_submit('hello', primary('Safe'), 1.0)
+    second.maybe_submit('hello', primary('Safe'), 1.0)
+    second.maybe_submit('you are ugly', primary('Cyberbullying'), 1.0)
+    first.shutdown(wait=True)
+    second.shutdown(wait=True)
+
+    stats = first.get_stats()
+    assert stats['processes'] == 2
+    assert stats['submitted'] == 3
+    assert stats['evaluated'] == 3
+    assert stats['stored_records'] == 3
+
+
+def test_submit_after_shutdown_is_rejected(shadow_module, model_file, tmp_path):
+    evaluator = make_evaluator(shadow_module, model_file, tmp_path, max_pending=1)
+    evaluator.shutdown(wait=True)
+
+    assert not evaluator.maybe_submit('hello', primary('Safe'), 1.0)
+    assert evaluator._slots.acquire(blocking=False)
+    assert evaluator.get_stats()['submitted'] == 0
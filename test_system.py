@@ -115,6 +115,29 @@ def test_feedback_endpoint(base_url):
         print(f"❌ Feedback test error: {e}")
         return False
 
+def test_shadow_stats_endpoint(base_url):
+    """Test the shadow model statistics endpoint"""
+    print("\n🔍 Testing shadow stats endpoint...")
+    try:
+        response = requests.get(f"{base_url}/api/shadow/stats")
+        
+        if response.status_code == 404:
+            print("✅ Shadow stats test passed: shadow model not enabled")
+            return True
+        elif response.status_code == 200:
+            data = response.json()
+            if "agreement_rate" in data and "dropped" in data:
+                print(f"✅ Shadow stats test passed: {data}")
+                return True
+            print(f"❌ Shadow stats missing fields: {data}")
+            return False
+        else:
+            print(f"❌ Shadow stats test failed: {response.status_code}")
+            return False
+    except Exception as e:
+        print(f"❌ Shadow stats test error: {e}")
+        return False
+
 def main():
     """Main test function"""
     print("🚀 MagicBully AI System Test")
@@ -130,7 +153,7 @@ def main():
     
     # Run tests
     tests_passed = 0
-    total_tests = 3
+    total_tests = 4
     
     # Test health endpoint
     if test_health_endpoint(base_url):
@@ -144,6 +167,10 @@ def main():
     if test_feedback_endpoint(base_url):
         tests_passed += 1
     
+    # Test shadow stats endpoint
+    if test_shadow_stats_endpoint(base_url):
+        tests_passed += 1
+    
     # Summary
     print("\n" + "=" * 40)
     print(f"📊 Test Summary: {tests_passed}/{total_tests} tests passed")